@@ -7,8 +7,352 @@ import sys
 import subprocess
 import json
 import datetime
+import argparse
+import io
+import mmap
+import tempfile
+import shutil
+import hashlib
+import base64
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 HISTORY_FILE = 'combined_history.json'
+# Inputs at least this large are memory-mapped instead of being read into memory
+MMAP_THRESHOLD = 1024 * 1024
+# Passing '-' as a source or destination means stdin / stdout
+STDIO_MARKER = '-'
+
+SCAN_CACHE_FILE = 'page_scan_cache.json'
+# Bump when the stored measurements change meaning so stale cache entries are recomputed
+SCAN_CACHE_VERSION = 3
+# Pages are rasterized in grayscale at this resolution for blank/duplicate detection
+SCAN_DPI = 72
+# Pages per job submitted to the worker pool
+SCAN_CHUNK_SIZE = 16
+# Pixels at least this many gray levels darker than the page's own paper level count as ink
+INK_CONTRAST = 64
+# Fraction of margin on each side ignored when measuring ink (scanner edges, punch holes)
+SCAN_MARGIN = 0.05
+# Pages with less ink coverage than this are considered blank; a 12pt one-word title is about 0.0003
+BLANK_INK_THRESHOLD = 0.0001
+# Page fingerprints average the ink of the page's content box onto a grid of this many (rows, columns)
+FINGERPRINT_SHAPE = (16, 32)
+# Share of the ink ignored at each edge when finding the content box
+FINGERPRINT_TRIM = 0.002
+# Ink with less than this share of inked pixels within SPECK_RADIUS pixels is treated as dust
+SPECK_RADIUS = 3
+SPECK_DENSITY = 0.1
+# Two pages are near-duplicates when their fingerprints correlate at least DUPLICATE_SIMILARITY, no
+# fingerprint cell differs by more than DUPLICATE_MAX_CELL_DIFFERENCE (0-1), and their ink coverage is
+# within DUPLICATE_COVERAGE_RATIO. Correlation catches different layouts; the cell difference catches
+# small local changes such as 'Appendix B' vs 'Appendix C'. On shifted, skewed, noisy and dusty
+# re-scans these measured >= 0.93 and <= 0.25; different pages differed by 0.71 or more in some cell.
+DUPLICATE_SIMILARITY = 0.85
+DUPLICATE_MAX_CELL_DIFFERENCE = 0.45
+DUPLICATE_COVERAGE_RATIO = 0.8
+
+def source_display_name(source):
+    if source == STDIO_MARKER:
+        return "<stdin>"
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(source)
+    # os.fdopen() streams have an integer fd as their name
+    name = getattr(source, 'name', None)
+    if isinstance(name, (str, os.PathLike)):
+        return os.path.basename(name) or "<stream>"
+    return "<stream>"
+
+def open_pdf_source(source):
+    # Returns something PdfReader can read without copying large files into Python bytes
+    if source == STDIO_MARKER:
+        source = sys.stdin.buffer
+    if isinstance(source, (str, os.PathLike)):
+        if os.path.getsize(source) < MMAP_THRESHOLD:
+            return source
+        with open(source, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if isinstance(source, mmap.mmap) or (hasattr(source, 'seekable') and source.seekable()):
+        source.seek(0)
+        return source
+    # Pipes can only be read once, so buffer them so the file can be reopened later
+    buffered = io.BytesIO(source.read())
+    buffered.name = getattr(source, 'name', '<stream>')
+    return buffered
+
+def spool_to_temp_file(source):
+    # Copies a stream input to a temp file; the caller removes it when done
+    stream = open_pdf_source(source)
+    fd, temp_path = tempfile.mkstemp(suffix='.pdf')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            shutil.copyfileobj(stream, f)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path
+
+def release_pdf_source(source, stream):
+    # Only close maps open_pdf_source created; caller-supplied streams and mmaps stay open.
+    # Closing promptly matters on Windows, where a mapped file cannot be replaced or deleted.
+    if isinstance(stream, mmap.mmap) and stream is not source:
+        stream.close()
+
+class PositionTrackingWriter:
+    # pypdf calls tell() to build the xref table, which pipes and stdout cannot answer
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = 0
+
+    def write(self, data):
+        self.stream.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        self.stream.flush()
+
+def write_pdf_output(writer, destination, release_inputs=None):
+    # release_inputs is called once the PDF is fully written, before any rename over the target
+    if destination == STDIO_MARKER:
+        destination = sys.stdout.buffer
+    if not isinstance(destination, (str, os.PathLike)):
+        writer.write(PositionTrackingWriter(destination))
+        if release_inputs:
+            release_inputs()
+        return
+
+    # Write next to the target and rename over it so readers never see a partial file
+    directory = os.path.dirname(os.path.abspath(destination))
+    fd, temp_path = tempfile.mkstemp(suffix='.pdf.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            writer.write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        if release_inputs:
+            release_inputs()
+        if os.path.exists(destination):
+            mode = os.stat(destination).st_mode & 0o777
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, destination)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def parse_page_range(range_str, max_pages):
+    if not range_str:
+        return list(range(max_pages))
+    indices = set()
+    parts = range_str.replace(" ", "").split(',')
+    for part in parts:
+        if '-' in part:
+            try:
+                start, end = map(int, part.split('-'))
+                if not (1 <= start <= end <= max_pages):
+                    raise ValueError(f"Invalid range '{part}': values out of bounds (1-{max_pages}).")
+                indices.update(range(start - 1, end))
+            except (ValueError, TypeError):
+                raise ValueError(f"Invalid range format: '{part}'")
+        else:
+            try:
+                page_num = int(part)
+                if not (1 <= page_num <= max_pages):
+                    raise ValueError(f"Page number {page_num} out of bounds (1-{max_pages}).")
+                indices.add(page_num - 1)
+            except (ValueError, TypeError):
+                raise ValueError(f"Invalid page number: '{part}'")
+    return sorted(list(indices))
+
+def format_page_range(indices):
+    # Inverse of parse_page_range: 0-based indices to a '1-3, 5' style string
+    parts = []
+    indices = sorted(indices)
+    i = 0
+    while i < len(indices):
+        j = i
+        while j + 1 < len(indices) and indices[j + 1] == indices[j] + 1:
+            j += 1
+        start, end = indices[i] + 1, indices[j] + 1
+        parts.append(f"{start}-{end}" if end > start else str(start))
+        i = j + 1
+    return ", ".join(parts)
+
+def open_pdf_reader(source):
+    # Non-interactive counterpart of PDFCombinerApp.get_pdf_reader_with_password
+    stream = open_pdf_source(source)
+    try:
+        reader = PdfReader(stream)
+        if reader.is_encrypted and not reader.decrypt(""):
+            raise ValueError(f"{source_display_name(source)} is encrypted and needs a password")
+        return reader
+    except BaseException:
+        release_pdf_source(source, stream)
+        raise
+
+def release_readers(readers):
+    for pdf_path, reader in readers:
+        release_pdf_source(pdf_path, reader.stream)
+
+def combine_items(items, output, metadata=None, password=None, open_reader=open_pdf_reader, on_progress=None):
+    # Combines file-list items ({'path', 'pages', 'rotation'}) into output: a path, '-' for stdout,
+    # or any writable binary stream. open_reader may return None to abort, e.g. a cancelled password prompt.
+    writer = PdfWriter()
+    # Keep readers alive until written; memory-mapped inputs are released afterwards
+    readers = []
+    try:
+        for i, item in enumerate(items):
+            pdf_path = item['path']
+            page_range_str = item.get('pages')
+            rotation_info = item.get('rotation')
+
+            reader = open_reader(pdf_path)
+            if reader is None:
+                raise Exception(f"Skipping file due to password failure: {source_display_name(pdf_path)}")
+            readers.append((pdf_path, reader))
+
+            page_indices = parse_page_range(page_range_str, len(reader.pages))
+
+            # Apply rotation if specified
+            if rotation_info:
+                pages_to_rotate_str = rotation_info['pages_str']
+                angle = rotation_info['angle']
+                if pages_to_rotate_str.lower() == 'all':
+                    pages_to_rotate_indices = range(len(reader.pages))
+                else:
+                    pages_to_rotate_indices = parse_page_range(pages_to_rotate_str, len(reader.pages))
+
+                for page_num in pages_to_rotate_indices:
+                    reader.pages[page_num].rotate(angle)
+
+            for page_num in page_indices:
+                writer.add_page(reader.pages[page_num])
+
+            if on_progress:
+                on_progress((i + 1) / len(items))
+
+        if metadata:
+            writer.add_metadata(metadata)
+        if password:
+            writer.encrypt(password)
+
+        write_pdf_output(writer, output, release_inputs=lambda: release_readers(readers))
+    finally:
+        release_readers(readers)
+
+# PyMuPDF and NumPy are optional and only needed for page scanning, so they are imported lazily
+
+def page_body(pixels):
+    height, width = pixels.shape
+    top, left = int(height * SCAN_MARGIN), int(width * SCAN_MARGIN)
+    body = pixels[top:height - top, left:width - left]
+    return body if body.size else pixels
+
+def ink_coverage(pixels):
+    # Measured against the page's own paper level, so grey scanner backgrounds are not ink
+    import numpy as np
+    body = page_body(pixels)
+    background = np.percentile(body, 90)
+    return float((body < background - INK_CONTRAST).mean())
+
+def resample_matrix(length, cells):
+    # Area-averaging weights that map length pixels onto cells cells, for any length >= 1
+    import numpy as np
+    edges = np.linspace(0, length, cells + 1)
+    pixels = np.arange(length)
+    overlap = np.minimum(edges[1:, None], pixels[None, :] + 1) - np.maximum(edges[:-1, None], pixels[None, :])
+    return np.clip(overlap, 0, None) * (cells / length)
+
+def content_span(profile):
+    # Index range holding all but FINGERPRINT_TRIM of the ink at each end
+    import numpy as np
+    cumulative = np.cumsum(profile)
+    if cumulative[-1] <= 0:
+        return 0, len(profile)
+    start = int(np.searchsorted(cumulative, cumulative[-1] * FINGERPRINT_TRIM))
+    stop = int(np.searchsorted(cumulative, cumulative[-1] * (1 - FINGERPRINT_TRIM))) + 1
+    return start, max(stop, start + 1)
+
+def box_density(mask, radius):
+    # Share of True pixels in the (2 * radius + 1) square around each pixel, via an integral image
+    import numpy as np
+    size = 2 * radius + 1
+    integral = np.pad(np.pad(mask.astype(np.float64), radius).cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+    window = integral[size:, size:] - integral[:-size, size:] - integral[size:, :-size] + integral[:-size, :-size]
+    return window / size ** 2
+
+def page_fingerprint(pixels):
+    # Ink darkness of the page's content box averaged onto FINGERPRINT_SHAPE. Cropping to the content
+    # cancels shifts and scale changes between scans, measuring darkness from the paper level cancels
+    # scanner noise, and isolated specks are dropped so dust cannot move the box.
+    # Returned base64-encoded, one byte per cell.
+    import numpy as np
+    body = page_body(pixels).astype(np.float64)
+    background = np.percentile(body, 90)
+    darkness = np.clip((background - INK_CONTRAST / 2 - body) / max(background, 1), 0, 1)
+    darkness *= box_density(darkness > 0.25, SPECK_RADIUS) >= SPECK_DENSITY
+    top, bottom = content_span(darkness.sum(axis=1))
+    left, right = content_span(darkness.sum(axis=0))
+    content = darkness[top:bottom, left:right]
+    rows, cols = FINGERPRINT_SHAPE
+    grid = resample_matrix(content.shape[0], rows) @ content @ resample_matrix(content.shape[1], cols).T
+    if grid.max() > 0:
+        grid = grid / grid.max()
+    return base64.b64encode(np.round(grid * 255).astype(np.uint8).tobytes()).decode('ascii')
+
+def scan_page_chunk(pdf_path, page_indices, dpi):
+    # Runs in a worker process
+    import numpy as np
+    import pymupdf
+    doc = pymupdf.open(pdf_path)
+    results = []
+    with doc:
+        for index in page_indices:
+            page = doc[index]
+            # Tiny pages are rendered larger so every fingerprint cell covers at least one pixel
+            scale = max(dpi / 72, (max(FINGERPRINT_SHAPE) + 2) / max(min(page.rect.width, page.rect.height), 1))
+            pix = page.get_pixmap(matrix=pymupdf.Matrix(scale, scale), colorspace=pymupdf.csGRAY, alpha=False)
+            pixels = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+            results.append((index, ink_coverage(pixels), page_fingerprint(pixels)))
+    return results
+
+def find_near_duplicates(fingerprints, coverages, min_similarity, max_cell_difference, min_coverage_ratio):
+    # Flags every page that matches an earlier kept page (see DUPLICATE_SIMILARITY for the criteria);
+    # flagged pages never cause further pages to be flagged. Pairs are compared in block x block tiles
+    # and only a block x pages boolean mask spans all columns, so memory stays small for any page count.
+    import numpy as np
+    cells = np.array([np.frombuffer(base64.b64decode(f), dtype=np.uint8) for f in fingerprints], dtype=np.int16)
+    vectors = cells.astype(np.float32)
+    vectors -= vectors.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms > 0, norms, 1)
+    coverages = np.asarray(coverages, dtype=np.float32)
+    flags = np.zeros(len(cells), dtype=bool)
+    block = 128
+    for start in range(0, len(cells), block):
+        stop = min(start + block, len(cells))
+        matches = np.zeros((stop - start, stop), dtype=bool)
+        for column in range(0, stop, block):
+            column_stop = min(column + block, stop)
+            row_coverage, column_coverage = coverages[start:stop, None], coverages[None, column:column_stop]
+            candidates = (vectors[start:stop] @ vectors[column:column_stop].T >= min_similarity) & \
+                (np.minimum(row_coverage, column_coverage) >= min_coverage_ratio * np.maximum(row_coverage, column_coverage))
+            rows, columns = np.nonzero(candidates)
+            difference = np.abs(cells[start + rows] - cells[column + columns]).max(axis=1)
+            matches[rows, column + columns] = difference <= max_cell_difference * 255
+        for row, index in enumerate(range(start, stop)):
+            flags[index] = (matches[row, :index] & ~flags[:index]).any()
+    return flags
 
 # A custom CTkInputDialog that can be given a parent
 class CustomInputDialog(ctk.CTkInputDialog):
@@ -76,7 +420,7 @@ class ScrollableFileList(ctk.CTkScrollableFrame):
             self.placeholder_label.pack_forget()
 
         for i, item in enumerate(self.app.file_list):
-            display_text = os.path.basename(item['path'])
+            display_text = source_display_name(item['path'])
             if item.get('pages'):
                 display_text += f" (Pages: {item['pages']})"
             if item.get('rotation'):
@@ -124,6 +468,9 @@ class PDFCombinerApp:
         
         self.clear_all_button = ctk.CTkButton(self.top_frame, text="Clear All", command=self.reset)
         self.clear_all_button.pack(side="left", padx=5, pady=5)
+
+        self.scan_button = ctk.CTkButton(self.top_frame, text="Scan Pages", command=self.scan_pages)
+        self.scan_button.pack(side="left", padx=5, pady=5)
         
         self.theme_modes = ["system", "dark", "light"]
         self.theme_index = self.theme_modes.index(ctk.get_appearance_mode() if ctk.get_appearance_mode() in self.theme_modes else "system")
@@ -194,6 +541,9 @@ class PDFCombinerApp:
         
         self.auto_open_var = ctk.BooleanVar(value=True)
         ctk.CTkCheckBox(self.options_frame, text="Open file after saving", variable=self.auto_open_var).grid(row=1, column=1, sticky='w', padx=5, pady=5)
+
+        self.scan_before_combine_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(self.options_frame, text="Scan for blank and duplicate pages before combining", variable=self.scan_before_combine_var).grid(row=2, column=1, sticky='w', padx=5, pady=5)
         
         self.combine_button = ctk.CTkButton(self.main_frame, text="Combine PDFs", command=self.combine_pdfs, height=30)
         self.combine_button.pack(fill="x", pady=5)
@@ -231,7 +581,7 @@ class PDFCombinerApp:
             item = self.last_removed_item['item']
             index = self.last_removed_item['index']
             self.file_list.insert(index, item)
-            self.update_status(f"Restored: {os.path.basename(item['path'])}")
+            self.update_status(f"Restored: {source_display_name(item['path'])}")
             self.file_list_frame.update_list()
             self._disable_undo()
 
@@ -281,30 +631,6 @@ class PDFCombinerApp:
             messagebox.showerror("Error", f"Could not open file.\n\n{e}")
             self.update_status("Error opening file.")
 
-    def parse_page_range(self, range_str, max_pages):
-        if not range_str:
-            return list(range(max_pages))
-        indices = set()
-        parts = range_str.replace(" ", "").split(',')
-        for part in parts:
-            if '-' in part:
-                try:
-                    start, end = map(int, part.split('-'))
-                    if not (1 <= start <= end <= max_pages):
-                        raise ValueError(f"Invalid range '{part}': values out of bounds (1-{max_pages}).")
-                    indices.update(range(start - 1, end))
-                except (ValueError, TypeError):
-                    raise ValueError(f"Invalid range format: '{part}'")
-            else:
-                try:
-                    page_num = int(part)
-                    if not (1 <= page_num <= max_pages):
-                        raise ValueError(f"Page number {page_num} out of bounds (1-{max_pages}).")
-                    indices.add(page_num - 1)
-                except (ValueError, TypeError):
-                    raise ValueError(f"Invalid page number: '{part}'")
-        return sorted(list(indices))
-    
     def add_pdfs(self):
         self._disable_undo()
         files = filedialog.askopenfilenames(
@@ -323,6 +649,15 @@ class PDFCombinerApp:
                 self.update_status(f"Added {added_count} file(s).")
             self.save_last_directory(os.path.dirname(files[0]))
 
+    def add_source(self, source):
+        # Queue a path, '-' for stdin, or any readable binary stream
+        if source == STDIO_MARKER or not isinstance(source, (str, os.PathLike)):
+            source = open_pdf_source(source)
+        self._disable_undo()
+        self.file_list.append({'path': source, 'pages': None})
+        self.file_list_frame.update_list()
+        self.update_status(f"Added {source_display_name(source)}.")
+
     def move_up(self):
         if self.selected_index > 0:
             self._disable_undo()
@@ -341,11 +676,11 @@ class PDFCombinerApp:
             
     def remove_selected(self):
         if 0 <= self.selected_index < len(self.file_list):
-            if messagebox.askyesno("Confirm Remove", f"Are you sure you want to remove '{os.path.basename(self.file_list[self.selected_index]['path'])}'?", icon='warning'):
+            if messagebox.askyesno("Confirm Remove", f"Are you sure you want to remove '{source_display_name(self.file_list[self.selected_index]['path'])}'?", icon='warning'):
                 item_to_remove = self.file_list[self.selected_index]
                 self.last_removed_item = {'item': item_to_remove, 'index': self.selected_index}
 
-                removed_file_name = os.path.basename(self.file_list.pop(self.selected_index)['path'])
+                removed_file_name = source_display_name(self.file_list.pop(self.selected_index)['path'])
                 
                 if self.selected_index >= len(self.file_list) and len(self.file_list) > 0:
                     self.selected_index = len(self.file_list) - 1
@@ -364,25 +699,29 @@ class PDFCombinerApp:
         file_item = self.file_list[self.selected_index]
         pdf_path = file_item['path']
         
+        reader = None
         try:
             reader = self.get_pdf_reader_with_password(pdf_path)
             if not reader: return
             max_pages = len(reader.pages)
         except Exception as e:
-            messagebox.showerror("Error", f"Could not open {os.path.basename(pdf_path)}.\n\n{e}", parent=self.root)
+            messagebox.showerror("Error", f"Could not open {source_display_name(pdf_path)}.\n\n{e}", parent=self.root)
             return
+        finally:
+            if reader:
+                release_pdf_source(pdf_path, reader.stream)
 
-        dialog = RotationDialog(self.root, os.path.basename(pdf_path), max_pages)
+        dialog = RotationDialog(self.root, source_display_name(pdf_path), max_pages)
         result = dialog.result
         
         if result:
             try:
                 # Validate pages string
                 if result['pages_str'].lower() != 'all':
-                    self.parse_page_range(result['pages_str'], max_pages) # Use for validation
+                    parse_page_range(result['pages_str'], max_pages) # Use for validation
                 
                 file_item['rotation'] = result
-                self.update_status(f"Rotation set for {os.path.basename(pdf_path)}.")
+                self.update_status(f"Rotation set for {source_display_name(pdf_path)}.")
                 self.file_list_frame.update_list()
             except ValueError as e:
                 messagebox.showerror("Invalid Page Range", str(e), parent=self.root)
@@ -395,18 +734,22 @@ class PDFCombinerApp:
         file_item = self.file_list[self.selected_index]
         pdf_path = file_item['path']
 
+        reader = None
         try:
             reader = self.get_pdf_reader_with_password(pdf_path)
             if not reader: return
             max_pages = len(reader.pages)
         except Exception as e:
-            messagebox.showerror("Error", f"Could not open {os.path.basename(pdf_path)}.\n\n{e}", parent=self.root)
+            messagebox.showerror("Error", f"Could not open {source_display_name(pdf_path)}.\n\n{e}", parent=self.root)
             return
+        finally:
+            if reader:
+                release_pdf_source(pdf_path, reader.stream)
 
         current_range = file_item.get('pages') or f"1-{max_pages}"
 
         dialog = CustomInputDialog(
-            text=f"Enter page range for {os.path.basename(pdf_path)}\n(e.g., '1-5, 8, 10-12'). Total pages: {max_pages}",
+            text=f"Enter page range for {source_display_name(pdf_path)}\n(e.g., '1-5, 8, 10-12'). Total pages: {max_pages}",
             title="Set Page Range",
             parent=self.root
         )
@@ -414,9 +757,9 @@ class PDFCombinerApp:
 
         if new_range is not None:
             try:
-                self.parse_page_range(new_range, max_pages)
+                parse_page_range(new_range, max_pages)
                 file_item['pages'] = new_range
-                self.update_status(f"Set page range for {os.path.basename(pdf_path)}")
+                self.update_status(f"Set page range for {source_display_name(pdf_path)}")
                 self.file_list_frame.update_list()
             except ValueError as e:
                 messagebox.showerror("Invalid Range", str(e), parent=self.root)
@@ -438,7 +781,8 @@ class PDFCombinerApp:
             return
         
         pdf_path = self.file_list[self.selected_index]['path']
-        self.update_status(f"Previewing metadata for {os.path.basename(pdf_path)}...")
+        self.update_status(f"Previewing metadata for {source_display_name(pdf_path)}...")
+        reader = None
         try:
             reader = self.get_pdf_reader_with_password(pdf_path)
             if reader is None:
@@ -459,21 +803,29 @@ class PDFCombinerApp:
             mod_date = meta.get('/ModDate', '')
             self.mod_date_var.set(mod_date[2:] if mod_date and mod_date.startswith("D:") else mod_date)
 
-            self.update_status(f"Metadata for {os.path.basename(pdf_path)} loaded.")
+            self.update_status(f"Metadata for {source_display_name(pdf_path)} loaded.")
             self.tab_view.set("Metadata")
         except Exception as e:
-            messagebox.showerror("Error", f"Could not read metadata from {os.path.basename(pdf_path)}.\n\n{e}", parent=self.root)
-            self.update_status(f"Error reading metadata for {os.path.basename(pdf_path)}.")
+            messagebox.showerror("Error", f"Could not read metadata from {source_display_name(pdf_path)}.\n\n{e}", parent=self.root)
+            self.update_status(f"Error reading metadata for {source_display_name(pdf_path)}.")
+        finally:
+            if reader:
+                release_pdf_source(pdf_path, reader.stream)
 
     def get_pdf_reader_with_password(self, pdf_path):
+        # Callers must pass the returned reader's stream to release_pdf_source when done
+        stream = None
         try:
-            reader = PdfReader(pdf_path)
+            stream = open_pdf_source(pdf_path)
+            reader = PdfReader(stream)
             if reader.is_encrypted:
                 for _ in range(3):
-                    dialog = CustomInputDialog(text=f"Enter password for {os.path.basename(pdf_path)}:", title="Password Required", parent=self.root)
+                    dialog = CustomInputDialog(text=f"Enter password for {source_display_name(pdf_path)}:", title="Password Required", parent=self.root)
                     password = dialog.get_input()
                     
-                    if password is None: return None
+                    if password is None:
+                        release_pdf_source(pdf_path, stream)
+                        return None
                     try:
                         if reader.decrypt(password):
                             _ = reader.pages[0]
@@ -481,12 +833,173 @@ class PDFCombinerApp:
                     except Exception:
                         pass # Let the error be shown after loop
                 messagebox.showerror("Error", "Incorrect password or failed to open PDF.", parent=self.root)
+                release_pdf_source(pdf_path, stream)
                 return None
             return reader
         except Exception as e:
-            messagebox.showerror("Error", f"Could not open PDF: {os.path.basename(pdf_path)}\n\n{e}", parent=self.root)
+            release_pdf_source(pdf_path, stream)
+            messagebox.showerror("Error", f"Could not open PDF: {source_display_name(pdf_path)}\n\n{e}", parent=self.root)
             return None
 
+    def load_scan_cache(self):
+        if os.path.exists(SCAN_CACHE_FILE):
+            try:
+                with open(SCAN_CACHE_FILE, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Failed to load scan cache: {e}", file=sys.stderr)
+        return {}
+
+    def save_scan_cache(self, cache):
+        try:
+            with open(SCAN_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+        except Exception as e:
+            print(f"Failed to save scan cache: {e}", file=sys.stderr)
+
+    def get_scan_cache_entry(self, cache, source):
+        # Returns (cache key, cached entry); paths are keyed by size and mtime, streams by content
+        if isinstance(source, (str, os.PathLike)):
+            stat = os.stat(source)
+            key = os.path.abspath(source)
+            entry = cache.get(key)
+            if not entry or entry.get('size') != stat.st_size or entry.get('mtime') != stat.st_mtime or entry.get('dpi') != SCAN_DPI or entry.get('version') != SCAN_CACHE_VERSION:
+                entry = {'size': stat.st_size, 'mtime': stat.st_mtime, 'dpi': SCAN_DPI, 'version': SCAN_CACHE_VERSION, 'pages': {}}
+            return key, entry
+        stream = open_pdf_source(source)
+        digest = hashlib.sha1()
+        for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+            digest.update(chunk)
+        key = "sha1:" + digest.hexdigest()
+        entry = cache.get(key)
+        if not entry or entry.get('dpi') != SCAN_DPI or entry.get('version') != SCAN_CACHE_VERSION:
+            entry = {'dpi': SCAN_DPI, 'version': SCAN_CACHE_VERSION, 'pages': {}}
+        return key, entry
+
+    def scan_pages(self):
+        if not self.file_list:
+            messagebox.showerror("Error", "No PDFs selected.", parent=self.root)
+            return
+        if importlib.util.find_spec("numpy") is None or importlib.util.find_spec("pymupdf") is None:
+            messagebox.showerror("Missing Dependencies", "Scanning pages requires PyMuPDF and NumPy.\n\npip install pymupdf numpy", parent=self.root)
+            return
+
+        self._disable_undo()
+        self.progress_bar.pack(fill="x", padx=10, pady=(5,0))
+        self.progress_bar.set(0)
+        self.update_status(f"Scanning {len(self.file_list)} files for blank and duplicate pages...")
+
+        cache = self.load_scan_cache()
+        scanned = []  # (item, page indices, cache entry) in combine order
+        skipped = []
+        # Workers open inputs by path, so stream inputs are written to a temp file once instead of
+        # being pickled into every job
+        temp_paths = []
+        try:
+            jobs = []
+            for item in self.file_list:
+                pdf_path = item['path']
+                stream = open_pdf_source(pdf_path)
+                try:
+                    reader = PdfReader(stream)
+                    is_encrypted = reader.is_encrypted
+                    max_pages = None if is_encrypted else len(reader.pages)
+                finally:
+                    release_pdf_source(pdf_path, stream)
+                if is_encrypted:
+                    skipped.append(source_display_name(pdf_path))
+                    continue
+                page_indices = parse_page_range(item.get('pages'), max_pages)
+                key, entry = self.get_scan_cache_entry(cache, pdf_path)
+                cache[key] = entry
+                scanned.append((item, page_indices, entry))
+                missing = [i for i in page_indices if str(i) not in entry['pages']]
+                if not missing:
+                    continue
+                if isinstance(pdf_path, (str, os.PathLike)):
+                    worker_path = os.fspath(pdf_path)
+                else:
+                    worker_path = spool_to_temp_file(pdf_path)
+                    temp_paths.append(worker_path)
+                for start in range(0, len(missing), SCAN_CHUNK_SIZE):
+                    jobs.append((entry, worker_path, missing[start:start + SCAN_CHUNK_SIZE]))
+
+            if jobs:
+                with ProcessPoolExecutor() as pool:
+                    futures = {pool.submit(scan_page_chunk, worker_path, chunk, SCAN_DPI): entry for entry, worker_path, chunk in jobs}
+                    for done, future in enumerate(as_completed(futures), 1):
+                        for index, coverage, fingerprint in future.result():
+                            futures[future]['pages'][str(index)] = [coverage, fingerprint]
+                        self.progress_bar.set(done / len(jobs))
+                        self.root.update_idletasks()
+                self.save_scan_cache(cache)
+        except Exception as e:
+            self.update_status(f"Error: {e}")
+            messagebox.showerror("Error", f"Failed to scan pages.\n\n{e}", parent=self.root)
+            return
+        finally:
+            for temp_path in temp_paths:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            self.progress_bar.pack_forget()
+
+        # Blank pages are never used as the original of a duplicate
+        pages = [(item, index, *entry['pages'][str(index)]) for item, page_indices, entry in scanned for index in page_indices]
+        blank = [coverage < BLANK_INK_THRESHOLD for _, _, coverage, _ in pages]
+        inked = [page for page, is_blank in zip(pages, blank) if not is_blank]
+        duplicate = find_near_duplicates([fingerprint for _, _, _, fingerprint in inked], [coverage for _, _, coverage, _ in inked],
+                                         DUPLICATE_SIMILARITY, DUPLICATE_MAX_CELL_DIFFERENCE, DUPLICATE_COVERAGE_RATIO) if inked else []
+
+        flagged = {}
+        for (item, index, _, _), is_blank in zip(pages, blank):
+            if is_blank:
+                flagged.setdefault(id(item), {'blank': [], 'duplicate': []})['blank'].append(index)
+        for (item, index, _, _), is_duplicate in zip(inked, duplicate):
+            if is_duplicate:
+                flagged.setdefault(id(item), {'blank': [], 'duplicate': []})['duplicate'].append(index)
+
+        skipped_note = f"\n\nSkipped encrypted files: {', '.join(skipped)}" if skipped else ""
+        if not flagged:
+            self.update_status("No blank or duplicate pages found.")
+            messagebox.showinfo("Scan Pages", f"No blank or duplicate pages found.{skipped_note}", parent=self.root)
+            return
+
+        summary = []
+        for item, _, _ in scanned:
+            flags = flagged.get(id(item))
+            if not flags:
+                continue
+            line = f"{source_display_name(item['path'])}:"
+            if flags['blank']:
+                line += f"\n  Blank: {format_page_range(flags['blank'])}"
+            if flags['duplicate']:
+                line += f"\n  Duplicate: {format_page_range(flags['duplicate'])}"
+            summary.append(line)
+
+        if not messagebox.askyesno("Scan Pages", "Exclude these pages from the combined PDF?\n\n" + "\n".join(summary) + skipped_note, parent=self.root):
+            self.update_status("Page exclusions not applied.")
+            return
+
+        excluded_count = 0
+        for item, page_indices, _ in scanned:
+            flags = flagged.get(id(item))
+            if not flags:
+                continue
+            excluded = set(flags['blank']) | set(flags['duplicate'])
+            excluded_count += len(excluded)
+            remaining = [i for i in page_indices if i not in excluded]
+            if remaining:
+                item['pages'] = format_page_range(remaining)
+            else:
+                # An empty range would mean "all pages", so drop files with nothing left
+                self.file_list.remove(item)
+        self.selected_index = -1
+        self.clear_metadata_fields()
+        self.file_list_frame.update_list()
+        self.update_status(f"Excluded {excluded_count} blank or duplicate page(s).")
+
     def save_to_history(self, file_path, metadata):
         entry = {
             "file_path": file_path,
@@ -503,7 +1016,7 @@ class PDFCombinerApp:
             with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
                 json.dump(history, f, indent=2)
         except Exception as e:
-            print(f"Failed to save history: {e}")
+            print(f"Failed to save history: {e}", file=sys.stderr)
         self.load_history()
         self.refresh_history_ui()
 
@@ -514,7 +1027,7 @@ class PDFCombinerApp:
                 with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
                     self.history = json.load(f)
             except Exception as e:
-                print(f"Failed to load history: {e}")
+                print(f"Failed to load history: {e}", file=sys.stderr)
                 self.history = []
 
     def refresh_history_ui(self):
@@ -595,7 +1108,7 @@ class PDFCombinerApp:
             with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
                 json.dump(self.history, f, indent=2)
         except Exception as e:
-            print(f"Failed to save history data: {e}")
+            print(f"Failed to save history data: {e}", file=sys.stderr)
 
     def combine_pdfs(self):
         if not self.file_list:
@@ -603,6 +1116,12 @@ class PDFCombinerApp:
             self.update_status("Combine failed: No PDFs selected.")
             return
 
+        if self.scan_before_combine_var.get():
+            self.scan_pages()
+            if not self.file_list:
+                self.update_status("Combine failed: No pages left after scanning.")
+                return
+
         self._disable_undo()
         self.progress_bar.pack(fill="x", padx=10, pady=(5,0))
         self.progress_bar.set(0)
@@ -618,53 +1137,19 @@ class PDFCombinerApp:
 
         self.save_last_directory(os.path.dirname(save_path))
         self.update_status(f"Combining {len(self.file_list)} files...")
-        writer = PdfWriter()
-        
-        try:
-            for i, item in enumerate(self.file_list):
-                pdf_path = item['path']
-                page_range_str = item.get('pages')
-                rotation_info = item.get('rotation')
-                
-                reader = self.get_pdf_reader_with_password(pdf_path)
-                if reader is None:
-                    raise Exception(f"Skipping file due to password failure: {os.path.basename(pdf_path)}")
-                
-                page_indices = self.parse_page_range(page_range_str, len(reader.pages))
-
-                # Apply rotation if specified
-                if rotation_info:
-                    pages_to_rotate_str = rotation_info['pages_str']
-                    angle = rotation_info['angle']
-                    if pages_to_rotate_str.lower() == 'all':
-                        pages_to_rotate_indices = range(len(reader.pages))
-                    else:
-                        pages_to_rotate_indices = self.parse_page_range(pages_to_rotate_str, len(reader.pages))
-                    
-                    for page_num in pages_to_rotate_indices:
-                        reader.pages[page_num].rotate(angle)
 
-                for page_num in page_indices:
-                    writer.add_page(reader.pages[page_num])
-                
-                self.progress_bar.set((i + 1) / len(self.file_list))
-                self.root.update_idletasks()
-
-            metadata = {
-                "/Title": self.title_var.get(), "/Author": self.author_var.get(),
-                "/Subject": self.subject_var.get(), "/Creator": self.creator_var.get(),
-                "/Producer": self.producer_var.get(), "/Keywords": self.keywords_var.get(),
-                "/CreationDate": "D:" + self.creation_date_var.get() if self.creation_date_var.get() else "",
-                "/ModDate": "D:" + self.mod_date_var.get() if self.mod_date_var.get() else ""
-            }
-            writer.add_metadata({k: v for k, v in metadata.items() if v})
-            
-            password = self.password_var.get()
-            if password:
-                writer.encrypt(password)
+        metadata = {
+            "/Title": self.title_var.get(), "/Author": self.author_var.get(),
+            "/Subject": self.subject_var.get(), "/Creator": self.creator_var.get(),
+            "/Producer": self.producer_var.get(), "/Keywords": self.keywords_var.get(),
+            "/CreationDate": "D:" + self.creation_date_var.get() if self.creation_date_var.get() else "",
+            "/ModDate": "D:" + self.mod_date_var.get() if self.mod_date_var.get() else ""
+        }
+        metadata = {k: v for k, v in metadata.items() if v}
 
-            with open(save_path, "wb") as f:
-                writer.write(f)
+        try:
+            combine_items(self.file_list, save_path, metadata, self.password_var.get(),
+                          open_reader=self.get_pdf_reader_with_password, on_progress=self.show_progress)
             self.update_status("Successfully combined PDF saved.")
             messagebox.showinfo("Success", f"Combined PDF saved to:\n{save_path}", parent=self.root)
             
@@ -672,7 +1157,7 @@ class PDFCombinerApp:
                 self.open_file(save_path)
             
             # Save to history
-            self.save_to_history(save_path, {k: v for k, v in metadata.items() if v})
+            self.save_to_history(save_path, metadata)
             self.reset()
         except Exception as e:
             self.update_status(f"Error: {e}")
@@ -680,6 +1165,10 @@ class PDFCombinerApp:
         finally:
             self.progress_bar.pack_forget()
 
+    def show_progress(self, fraction):
+        self.progress_bar.set(fraction)
+        self.root.update_idletasks()
+
     def reset(self):
         if self.file_list:
             if not messagebox.askyesno("Confirm Clear All", "Are you sure you want to clear the current file list?"):
@@ -692,6 +1181,24 @@ class PDFCombinerApp:
         self.update_status("Ready")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Combine PDF files.")
+    parser.add_argument('inputs', nargs='*', help="PDF files to add; '-' reads one piped to stdin")
+    parser.add_argument('-o', '--output', help="combine the inputs into this path ('-' for stdout) without opening a window")
+    args = parser.parse_args()
+
+    if args.output is not None:
+        # No window is created, so this also works in pipelines on machines without a display
+        if not args.inputs:
+            parser.error("-o/--output needs at least one input")
+        try:
+            combine_items([{'path': source} for source in args.inputs], args.output)
+        except Exception as e:
+            print(f"Failed to combine PDFs: {e}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0)
+
     root = ctk.CTk()
     app = PDFCombinerApp(root)
+    for source in args.inputs:
+        app.add_source(source)
     root.mainloop()
\ No newline at end of file